@@ -0,0 +1 @@
+from benchmarks.fake_rds import FakeRdsDataClient, ColumnSpec, DEFAULT_COLUMNS
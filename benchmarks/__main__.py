@@ -0,0 +1,77 @@
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from benchmarks.scenarios import SCENARIOS
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(run, repeat, rows):
+    run()  # warm-up
+    timings = []
+    for _ in range(0, repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    median = statistics.median(timings)
+    return {
+        'repeat': repeat, 'rows': rows, 'min': min(timings), 'median': median, 'mean': statistics.mean(timings),
+        'stdev': statistics.stdev(timings) if repeat > 1 else 0.0,
+        'rows_per_second': rows / median if median else None
+    }
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)['results']
+    for name, result in results.items():
+        if name in baseline:
+            ratio = result['median'] / baseline[name]['median']
+            print(f'{name:32} {baseline[name]["median"] * 1000:10.3f}ms -> {result["median"] * 1000:10.3f}ms '
+                  f'({ratio:.2f}x)', file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='data-api-mapper benchmarks')
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.0, help='simulated seconds per Data API call')
+    parser.add_argument('--only', action='append', choices=sorted(SCENARIOS.keys()))
+    parser.add_argument('--output', help='write the JSON results to this file instead of stdout')
+    parser.add_argument('--compare', help='JSON results of a previous run to compare against')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in args.only or SCENARIOS.keys():
+        run, rows = SCENARIOS[name](args.rows, args.latency)
+        results[name] = measure(run, args.repeat, rows)
+        print(f'{name:32} {results[name]["median"] * 1000:10.3f}ms', file=sys.stderr)
+
+    output = {
+        'commit': git_revision(), 'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(), 'platform': platform.platform(),
+        'config': {'rows': args.rows, 'repeat': args.repeat, 'latency': args.latency},
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(output, output_file, indent=2)
+    else:
+        print(json.dumps(output, indent=2))
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
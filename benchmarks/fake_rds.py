@@ -0,0 +1,138 @@
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+LIMIT_OFFSET = re.compile(r'\blimit\s+(\d+)(?:\s+offset\s+(\d+))?\s*$', re.IGNORECASE)
+
+
+@dataclass
+class ColumnSpec:
+    name: str
+    type_name: str
+    null_ratio: float = 0.0
+
+    def metadata(self):
+        return {'name': self.name, 'tableName': 'bench', 'typeName': self.type_name, 'nullable': 1}
+
+
+DEFAULT_COLUMNS = [
+    ColumnSpec('id', 'int4'),
+    ColumnSpec('a_name', 'text', 0.1),
+    ColumnSpec('doc', 'jsonb', 0.1),
+    ColumnSpec('num_numeric', 'numeric', 0.1),
+    ColumnSpec('num_float', 'float8', 0.1),
+    ColumnSpec('ts', 'timestamptz', 0.1),
+    ColumnSpec('a_date', 'date', 0.1),
+    ColumnSpec('field_boolean', 'bool', 0.5),
+]
+
+EPOCH = datetime(2021, 3, 3, 15, 51, 48, 82288)
+
+
+class FakeRdsDataClient:
+
+    def __init__(self, rows=1000, columns=None, latency=0.0, seed=42, failures=()) -> None:
+        super().__init__()
+        self.rows = rows
+        self.columns = columns if columns is not None else DEFAULT_COLUMNS
+        self.latency = latency
+        self.random = random.Random(seed)
+        self.records = [self.build_record(x) for x in range(0, rows)]
+        self.failures = list(failures)
+        self.statements = []
+        self.calls = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.lock = threading.Lock()
+
+    def build_array(self, type_name, i):
+        size = self.random.randrange(0, 16)
+        if type_name in ('_int2', '_int4', '_int8'):
+            return {'longValues': [i + x for x in range(0, size)]}
+        if type_name in ('_float4', '_float8'):
+            return {'doubleValues': [self.random.random() * 1000 for _ in range(0, size)]}
+        if type_name == '_bool':
+            return {'booleanValues': [self.random.random() < 0.5 for _ in range(0, size)]}
+        if type_name == '_numeric':
+            return {'stringValues': [f'{self.random.random() * 1000:.5f}' for _ in range(0, size)]}
+        return {'stringValues': [f'item {i}-{x}' for x in range(0, size)]}
+
+    def build_value(self, column, i):
+        if column.null_ratio and self.random.random() < column.null_ratio:
+            return {'isNull': True}
+        if column.type_name.startswith('_'):
+            return {'arrayValue': self.build_array(column.type_name, i)}
+        if column.type_name in ('int2', 'int4', 'int8', 'serial'):
+            return {'longValue': i}
+        if column.type_name in ('float4', 'float8'):
+            return {'doubleValue': self.random.random() * 1000}
+        if column.type_name == 'bool':
+            return {'booleanValue': self.random.random() < 0.5}
+        if column.type_name == 'numeric':
+            return {'stringValue': f'{self.random.random() * 100000:.5f}'}
+        if column.type_name in ('timestamptz', 'timestamp'):
+            return {'stringValue': str(EPOCH + timedelta(seconds=i, microseconds=self.random.randrange(0, 10 ** 6)))}
+        if column.type_name == 'date':
+            return {'stringValue': (EPOCH + timedelta(days=i % 3650)).date().isoformat()}
+        if column.type_name in ('json', 'jsonb'):
+            doc = {'string_value': f'string{i}', 'int_value': i, 'float_value': i * 1.11, 'tags': ['a', 'b']}
+            return {'stringValue': json.dumps(doc)}
+        return {'stringValue': f'row {i} ' + 'x' * self.random.randrange(0, 32)}
+
+    def build_record(self, i):
+        return [self.build_value(x, i) for x in self.columns]
+
+    def _wait(self):
+        # exceptions in `failures` are raised, in order, by the next calls
+        with self.lock:
+            self.calls += 1
+            failure = self.failures.pop(0) if self.failures else None
+            if failure is not None:
+                raise failure
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            self.in_flight -= 1
+
+    def begin_transaction(self, **kwargs):
+        self._wait()
+        return {'transactionId': f'bench-{self.calls}'}
+
+    def commit_transaction(self, **kwargs):
+        self._wait()
+        return {'transactionStatus': 'Transaction Committed'}
+
+    def rollback_transaction(self, **kwargs):
+        self._wait()
+        return {'transactionStatus': 'Rollback Complete'}
+
+    def _record(self, kwargs):
+        with self.lock:
+            self.statements.append(dict(kwargs, thread=threading.current_thread().name))
+
+    def execute_statement(self, **kwargs):
+        self._record(kwargs)
+        self._wait()
+        sql = kwargs['sql'].strip()
+        if not sql.lower().startswith(('select', 'with')):
+            return {'numberOfRecordsUpdated': 1, 'generatedFields': []}
+        records = self.records
+        match = LIMIT_OFFSET.search(sql)
+        if match:
+            limit, offset = int(match.group(1)), int(match.group(2) or 0)
+            records = records[offset:offset + limit]
+        response = {'records': records, 'numberOfRecordsUpdated': 0}
+        if kwargs.get('includeResultMetadata'):
+            response['columnMetadata'] = [x.metadata() for x in self.columns]
+        return response
+
+    def batch_execute_statement(self, **kwargs):
+        self._record(kwargs)
+        self._wait()
+        return {'updateResults': [{'generatedFields': []} for _ in kwargs.get('parameterSets', [])]}
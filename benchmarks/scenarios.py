@@ -0,0 +1,110 @@
+import io
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from benchmarks.fake_rds import FakeRdsDataClient, ColumnSpec
+from data_api_mapper import DataAPIClient
+from data_api_mapper.appsync import CamelSnakeConverter
+from data_api_mapper.converters import POSTGRES_PYTHON_MAPPER, POSTGRES_APPSYNC_MAPPER, \
+    POSTGRES_PYTHON_COMPACT_ARRAY_MAPPER
+from data_api_mapper.data_api import DictionaryMapper, ParameterBuilder, QueryResponse
+
+SCENARIOS = {}
+
+
+def scenario(name):
+    def register(function):
+        SCENARIOS[name] = function
+        return function
+    return register
+
+
+def build_client(rows, latency=0.0):
+    return DataAPIClient(FakeRdsDataClient(rows, latency=latency), 'secret', 'cluster', 'bench')
+
+
+ARRAY_COLUMNS = [
+    ColumnSpec('id', 'int4'), ColumnSpec('ints', '_int4', 0.1), ColumnSpec('floats', '_float8', 0.1),
+    ColumnSpec('texts', '_text', 0.1), ColumnSpec('numerics', '_numeric', 0.1),
+]
+
+
+def build_response(rows, columns=None):
+    client = FakeRdsDataClient(rows, columns)
+    return QueryResponse.from_dict(client.execute_statement(sql='select', includeResultMetadata=True))
+
+
+# every scenario receives the configuration and returns (run, rows processed per run)
+
+@scenario('dictionary_mapper_python')
+def dictionary_mapper_python(rows, latency):
+    response = build_response(rows)
+    return lambda: DictionaryMapper(response.metadata, POSTGRES_PYTHON_MAPPER).map(response.records), rows
+
+
+@scenario('dictionary_mapper_appsync')
+def dictionary_mapper_appsync(rows, latency):
+    response = build_response(rows)
+    return lambda: DictionaryMapper(response.metadata, POSTGRES_APPSYNC_MAPPER).map(response.records), rows
+
+
+@scenario('parameter_builder')
+def parameter_builder(rows, latency):
+    parameters = {
+        'id': 1, 'a_name': 'name', 'doc': {'a': 1, 'b': [1, 2], 'c': date(2021, 1, 1)}, 'num_float': 1.5,
+        'num_numeric': Decimal('10.12345'), 'ts': datetime(2021, 3, 3, 15, 51, 48, tzinfo=timezone.utc),
+        'tz_notimezone': datetime(2021, 3, 3, 15, 51, 48), 'a_date': date(1976, 11, 2), 'field_boolean': True,
+        'field_null': None
+    }
+    return lambda: [ParameterBuilder().from_query(parameters) for _ in range(0, rows)], rows
+
+
+@scenario('query')
+def query(rows, latency):
+    client = build_client(rows, latency)
+    return lambda: client.query('select * from bench'), rows
+
+
+@scenario('query_paginated')
+def query_paginated(rows, latency):
+    client = build_client(rows, latency)
+    return lambda: client.query_paginated('select * from bench', page_size=100), rows
+
+
+@scenario('batch_query')
+def batch_query(rows, latency):
+    client = build_client(rows, latency)
+    parameter_list = [{'id': x, 'a_name': str(x), 'ts': datetime(2021, 3, 3, 15, 51, 48)} for x in range(0, rows)]
+    return lambda: client.batch_query('insert into bench (id, a_name, ts) values (:id, :a_name, :ts)',
+                                      parameter_list), rows
+
+
+@scenario('camel_snake_converter')
+def camel_snake_converter(rows, latency):
+    records = build_client(rows).query('select * from bench', mapper=POSTGRES_APPSYNC_MAPPER)
+    return lambda: CamelSnakeConverter.dict_to_camel(records), rows
+
+
+@scenario('export_ndjson')
+def export_ndjson(rows, latency):
+    client = build_client(rows, latency)
+    return lambda: client.export('select * from bench', io.BytesIO(), 'ndjson', page_size=1000), rows
+
+
+@scenario('export_csv')
+def export_csv(rows, latency):
+    client = build_client(rows, latency)
+    return lambda: client.export('select * from bench', io.BytesIO(), 'csv', page_size=1000), rows
+
+
+@scenario('dictionary_mapper_arrays')
+def dictionary_mapper_arrays(rows, latency):
+    response = build_response(rows, ARRAY_COLUMNS)
+    return lambda: DictionaryMapper(response.metadata, POSTGRES_PYTHON_MAPPER).map(response.records), rows
+
+
+@scenario('dictionary_mapper_compact_arrays')
+def dictionary_mapper_compact_arrays(rows, latency):
+    response = build_response(rows, ARRAY_COLUMNS)
+    mapper = POSTGRES_PYTHON_COMPACT_ARRAY_MAPPER
+    return lambda: DictionaryMapper(response.metadata, mapper).map(response.records), rows
@@ -1,2 +1,5 @@
 from data_api_mapper.data_api import DataAPIClient
 from data_api_mapper.appsync import AppsyncEvent
+from data_api_mapper.retry import RetryPolicy, RetryError
+from data_api_mapper.instrumentation import HistogramCollector, QueryEvent
+from data_api_mapper.slow_query import SlowQueryLog
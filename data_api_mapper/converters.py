@@ -1,4 +1,5 @@
 import json
+from array import array
 from datetime import datetime, timezone, date
 from decimal import Decimal
 
@@ -40,11 +41,58 @@ class NumericToDecimal:
         return Decimal(value)
 
 
+class ArrayOf:
+
+    def __init__(self, element_converter=None, typecode=None) -> None:
+        super().__init__()
+        self.element_converter = element_converter
+        self.typecode = typecode
+
+    def convert(self, value):
+        key, items = next(iter(value.items()))
+        if key == 'arrayValues':
+            return [self.convert(x) for x in items]
+        if self.typecode is not None:
+            if None in items:
+                raise ValueError(f'Array with NULL elements can not be stored in array.array({self.typecode!r}), '
+                                 f'use POSTGRES_PYTHON_MAPPER for this column')
+            return array(self.typecode, items)
+        if self.element_converter is not None:
+            return [None if x is None else self.element_converter.convert(x) for x in items]
+        return items
+
+
+ARRAY_TO_LIST = ArrayOf()
+
+POSTGRES_ARRAY_MAPPER = {
+    '_int2': ARRAY_TO_LIST,
+    '_int4': ARRAY_TO_LIST,
+    '_int8': ARRAY_TO_LIST,
+    '_float4': ARRAY_TO_LIST,
+    '_float8': ARRAY_TO_LIST,
+    '_bool': ARRAY_TO_LIST,
+    '_text': ARRAY_TO_LIST,
+    '_varchar': ARRAY_TO_LIST,
+}
+
+POSTGRES_COMPACT_ARRAY_MAPPER = {
+    '_int2': ArrayOf(typecode='h'),
+    '_int4': ArrayOf(typecode='i'),
+    '_int8': ArrayOf(typecode='q'),
+    '_float4': ArrayOf(typecode='f'),
+    '_float8': ArrayOf(typecode='d'),
+}
+
 POSTGRES_APPSYNC_MAPPER = {
     'jsonb': JsonbToDict,
     'timestamptz': TimestampzToAWSDateTime,
     'timestamp': TimestampzToAWSDateTime,
-    'numeric': NumericToFloat
+    'numeric': NumericToFloat,
+    **POSTGRES_ARRAY_MAPPER,
+    '_jsonb': ArrayOf(JsonbToDict),
+    '_timestamptz': ArrayOf(TimestampzToAWSDateTime),
+    '_timestamp': ArrayOf(TimestampzToAWSDateTime),
+    '_numeric': ArrayOf(NumericToFloat),
 }
 
 POSTGRES_PYTHON_MAPPER = {
@@ -53,4 +101,15 @@ POSTGRES_PYTHON_MAPPER = {
     'timestamp': TimestampzToDatetimeUTC,
     'date': DateToDate,
     'numeric': NumericToDecimal,
+    **POSTGRES_ARRAY_MAPPER,
+    '_jsonb': ArrayOf(JsonbToDict),
+    '_timestamptz': ArrayOf(TimestampzToDatetimeUTC),
+    '_timestamp': ArrayOf(TimestampzToDatetimeUTC),
+    '_date': ArrayOf(DateToDate),
+    '_numeric': ArrayOf(NumericToDecimal),
+}
+
+POSTGRES_PYTHON_COMPACT_ARRAY_MAPPER = {
+    **POSTGRES_PYTHON_MAPPER,
+    **POSTGRES_COMPACT_ARRAY_MAPPER,
 }
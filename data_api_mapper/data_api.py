@@ -1,12 +1,22 @@
 import json
+import logging
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import date, datetime, timezone
 from decimal import Decimal
 from functools import reduce
-from typing import List, Dict, Any
-from data_api_mapper.converters import POSTGRES_PYTHON_MAPPER
+from time import perf_counter
+from typing import List, Dict, Any, Optional
+from data_api_mapper.converters import POSTGRES_PYTHON_MAPPER, ARRAY_TO_LIST
+from data_api_mapper.export import EXPORT_FORMATS, ExportStats, ExportWriter
+from data_api_mapper.instrumentation import QueryEvent
+from data_api_mapper.retry import RetryPolicy, KeepAlive
 from data_api_mapper.utils import DatetimeUtils
 
+logger = logging.getLogger(__name__)
+
 
 class ParameterBuilder:
 
@@ -20,6 +30,32 @@ class ParameterBuilder:
         else:
             return {'name': name, 'value': {type: value}}
 
+    @staticmethod
+    def array_literal(values):
+        # the Data API doesn't accept arrayValue parameters, arrays travel as a PostgreSQL array literal
+        return '{' + ','.join(ParameterBuilder.array_element(x) for x in values) + '}'
+
+    @staticmethod
+    def array_element(value):
+        if value is None:
+            return 'NULL'
+        if isinstance(value, (list, tuple, array)):
+            return ParameterBuilder.array_literal(value)
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        if isinstance(value, (int, float, Decimal)):
+            return str(value)
+        if isinstance(value, datetime) and DatetimeUtils.is_aware(value):
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        if isinstance(value, dict):
+            value = json.dumps(value, default=ParameterBuilder.json_serial)
+        escaped = str(value).replace('\\', '\\\\').replace('"', '\\"')
+        return f'"{escaped}"'
+
+    def add_array(self, name, values):
+        self.result.append(self.build_entry_map(name, self.array_literal(values), 'stringValue'))
+        return self
+
     @staticmethod
     def json_serial(obj):
         if isinstance(obj, date):
@@ -45,6 +81,8 @@ class ParameterBuilder:
         elif isinstance(value, float):
             self.result.append(self.build_entry_map(name, value, 'doubleValue'))
             return self
+        elif isinstance(value, array):
+            return self.add_array(name, value)
         elif isinstance(value, datetime):
             if DatetimeUtils.is_aware(value):
                 converted = str(value.astimezone(timezone.utc).replace(tzinfo=None))
@@ -81,6 +119,8 @@ class ParameterBuilder:
                 value = param['value']
                 if 'cast' in param:
                     self.result.append({'name': name, 'value': {'stringValue': value}, 'typeHint': param['cast']})
+                elif param.get('array', False):
+                    self.add_array(name, value)
                 else:
                     self.add(name, value)
         elif isinstance(parameters, dict):
@@ -122,6 +162,22 @@ class QueryResponse:
         return QueryResponse(a_dict['records'], QueryMetadata(row_metadata_list))
 
 
+@dataclass
+class StatementResult:
+    value: Any = None
+    error: Optional[BaseException] = None
+    cancelled: bool = False
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def get(self):
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
 class Transaction:
     def __init__(self, data_client) -> None:
         super().__init__()
@@ -134,12 +190,23 @@ class Transaction:
             secretArn=self.secret_arn, database=self.database_name, resourceArn=self.cluster_arn
         )
         self.transaction_id = transaction['transactionId']
+        self.listeners = []
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+        return listener
+
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+
+    def _all_listeners(self):
+        return self.data_client.listeners + self.listeners if self.listeners else self.data_client.listeners
 
     def query(self, sql, parameters=(), mapper=POSTGRES_PYTHON_MAPPER) -> Dict[str, Any]:
-        return self.data_client.query(sql, parameters, mapper, self.transaction_id)
+        return self.data_client._query(sql, parameters, mapper, self.transaction_id, self._all_listeners())
 
     def batch_query(self, sql, parameters=()) -> Dict[str, Any]:
-        return self.data_client.batch_query(sql, parameters, self.transaction_id)
+        return self.data_client._batch_query(sql, parameters, self.transaction_id, self._all_listeners())
 
     def commit(self) -> Dict[str, str]:
         return self.rds_client.commit_transaction(
@@ -154,15 +221,47 @@ class Transaction:
 
 class DataAPIClient:
 
-    def __init__(self, rds_client, secret_arn, cluster_arn, database_name, mapper=POSTGRES_PYTHON_MAPPER) -> None:
+    def __init__(self, rds_client, secret_arn, cluster_arn, database_name, mapper=POSTGRES_PYTHON_MAPPER,
+                 retry_policy=None, max_workers=8) -> None:
         super().__init__()
         self.rds_client = rds_client
         self.secret_arn = secret_arn
         self.cluster_arn = cluster_arn
         self.database_name = database_name
         self.mapper = mapper
+        self.retry_policy = retry_policy
+        self.listeners = []
+        self.max_workers = max_workers
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _execute(self, function, config):
+        if self.retry_policy is None:
+            return function(**config)
+        return self.retry_policy.call(function, config)
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+        return listener
+
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+
+    @staticmethod
+    def _notify(listeners, event):
+        # a failing listener must not change the outcome of the statement
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception:
+                logger.exception('Query listener %r failed', listener)
 
     def query(self, sql, parameters=None, mapper=None, transaction_id=None):
+        return self._query(sql, parameters, mapper, transaction_id, self.listeners)
+
+    def _query(self, sql, parameters, mapper, transaction_id, listeners):
+        instrumented = bool(listeners)
+        started = perf_counter() if instrumented else 0.0
         this_mapper = mapper if mapper is not None else self.mapper
         data_client_params = ParameterBuilder().from_query(parameters)
         config = {
@@ -172,14 +271,34 @@ class DataAPIClient:
         }
         if transaction_id is not None:
             config['transactionId'] = transaction_id
-        response = self.rds_client.execute_statement(**config)
+        built = perf_counter() if instrumented else 0.0
+        try:
+            response = self._execute(self.rds_client.execute_statement, config)
+        except Exception as error:
+            if instrumented:
+                self._notify(listeners, QueryEvent.from_error(
+                    sql, transaction_id, started, built, perf_counter(), error, parameters
+                ))
+            raise
+        received = perf_counter() if instrumented else 0.0
         if 'columnMetadata' in response:
-            response = QueryResponse.from_dict(response)
-            return DictionaryMapper(response.metadata, this_mapper).map(response.records)
+            query_response = QueryResponse.from_dict(response)
+            result = DictionaryMapper(query_response.metadata, this_mapper).map(query_response.records)
         else:
-            return response['numberOfRecordsUpdated']
+            result = response['numberOfRecordsUpdated']
+        if instrumented:
+            self._notify(listeners, QueryEvent.from_response(
+                sql, transaction_id, started, built, received, perf_counter(), response, parameters
+            ))
+        return result
 
     def batch_query(self, sql, parameter_list=(), transaction_id=None):
+        return self._batch_query(sql, parameter_list, transaction_id, self.listeners)
+
+    def _batch_query(self, sql, parameter_list, transaction_id, listeners):
+        instrumented = bool(listeners)
+        started = perf_counter() if instrumented else 0.0
+        parameter_list = list(parameter_list)
         data_client_params = [ParameterBuilder().from_query(x) for x in parameter_list]
         config = {
             'secretArn': self.secret_arn, 'database': self.database_name, 'resourceArn': self.cluster_arn,
@@ -187,9 +306,93 @@ class DataAPIClient:
         }
         if transaction_id is not None:
             config['transactionId'] = transaction_id
-        response = self.rds_client.batch_execute_statement(**config)
+        built = perf_counter() if instrumented else 0.0
+        first_parameters = parameter_list[0] if instrumented and parameter_list else None
+        try:
+            response = self._execute(self.rds_client.batch_execute_statement, config)
+        except Exception as error:
+            if instrumented:
+                self._notify(listeners, QueryEvent.from_error(
+                    sql, transaction_id, started, built, perf_counter(), error, first_parameters
+                ))
+            raise
+        if instrumented:
+            received = perf_counter()
+            self._notify(listeners, QueryEvent.from_response(
+                sql, transaction_id, started, built, received, received, response, first_parameters
+            ))
         return response
 
+    def _get_executor(self):
+        # the pool is shared by every query_many call, it's never resized or replaced while in use
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='data-api-query')
+            return self._executor
+
+    def query_many(self, statements, max_workers=None, timeout=None) -> List[StatementResult]:
+        if max_workers is not None and max_workers < 1:
+            raise ValueError('max_workers must be greater than 0')
+        statements = list(statements)
+        executor = self._get_executor()
+        limit = max_workers if max_workers is not None else len(statements)
+        futures = [None for _ in statements]
+        errors = [None for _ in statements]
+        lock = threading.RLock()
+        finished = threading.Event()
+        state = {'submitted': 0, 'done': 0, 'stopped': False}
+
+        # at most `limit` statements of this call are in flight, the next one is submitted when one finishes
+        def submit_next():
+            i = state['submitted']
+            try:
+                future = executor.submit(self.query, *statements[i])
+            except RuntimeError as error:
+                # the pool was closed by `close()`, none of the remaining statements can run
+                errors[i:] = [error for _ in statements[i:]]
+                state['done'] += len(statements) - i
+                state['submitted'] = len(statements)
+                if state['done'] == state['submitted']:
+                    finished.set()
+                return
+            state['submitted'] += 1
+            futures[i] = future
+            future.add_done_callback(on_done)
+
+        def on_done(_):
+            with lock:
+                state['done'] += 1
+                if not state['stopped'] and state['submitted'] < len(statements):
+                    submit_next()
+                elif state['done'] == state['submitted']:
+                    finished.set()
+
+        with lock:
+            if not statements:
+                finished.set()
+            while state['submitted'] < min(limit, len(statements)):
+                submit_next()
+        finished.wait(timeout)
+        with lock:
+            state['stopped'] = True
+        results = []
+        for future, submit_error in zip(futures, errors):
+            if submit_error is not None:
+                results.append(StatementResult(None, submit_error, True))
+            elif future is not None and future.done() and not future.cancelled():
+                error = future.exception()
+                results.append(StatementResult(None if error else future.result(), error))
+            else:
+                error = TimeoutError(f'Statement did not finish in {timeout}s')
+                results.append(StatementResult(None, error, future is None or future.cancel()))
+        return results
+
+    def close(self):
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
     def query_paginated(self, sql, parameters=None, mapper=POSTGRES_PYTHON_MAPPER, page_size=100):
         paginator = self.paginator(sql, parameters, mapper, page_size)
         return reduce(lambda x, y: x+y, paginator)
@@ -210,9 +413,59 @@ class DataAPIClient:
 
         return paginate()
 
+    def _raw_pages(self, sql, parameters=None, page_size=1000):
+        data_client_params = ParameterBuilder().from_query(parameters)
+        offset = 0
+        while True:
+            config = {
+                'secretArn': self.secret_arn, 'database': self.database_name,
+                'resourceArn': self.cluster_arn, 'includeResultMetadata': True,
+                'sql': f'{sql} limit {page_size} offset {offset}', 'parameters': data_client_params
+            }
+            response = self._execute(self.rds_client.execute_statement, config)
+            yield response
+            if len(response['records']) < page_size:
+                return
+            offset += page_size
+
+    def export(self, sql, fileobj, format='ndjson', parameters=None, page_size=1000, compress=False,
+               progress=None, compresslevel=6) -> ExportStats:
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f'Unknown export format {format}, expected one of {list(EXPORT_FORMATS.keys())}')
+        started = perf_counter()
+        writer = ExportWriter(fileobj, compress, compresslevel=compresslevel)
+        rows = 0
+        exporter = None
+        try:
+            for response in self._raw_pages(sql, parameters, page_size):
+                if exporter is None:
+                    metadata = QueryResponse.from_dict(response).metadata
+                    exporter = EXPORT_FORMATS[format](metadata.field_names(), [x.type_name for x in metadata.rows])
+                    writer.write(exporter.header())
+                writer.write(exporter.page(response['records']))
+                rows += len(response['records'])
+                if progress is not None:
+                    progress(ExportStats(rows, writer.bytes, perf_counter() - started))
+        finally:
+            writer.close()
+        return ExportStats(rows, writer.bytes, perf_counter() - started)
+
     def begin_transaction(self):
         return Transaction(self)
 
+    def warm_up(self, deadline=60.0, sql='SELECT 1', retry_policy=None):
+        policy = retry_policy if retry_policy is not None else RetryPolicy(
+            max_attempts=None, base_delay=0.5, max_delay=5.0, deadline=deadline
+        )
+        config = {
+            'secretArn': self.secret_arn, 'database': self.database_name,
+            'resourceArn': self.cluster_arn, 'sql': sql
+        }
+        return policy.call(self.rds_client.execute_statement, config)
+
+    def keep_alive(self, interval=240.0, sql='SELECT 1'):
+        return KeepAlive(self, interval, sql)
+
 
 class DictionaryMapper:
 
@@ -223,7 +476,11 @@ class DictionaryMapper:
     @staticmethod
     def map_field(field_data, converter):
         key, value = list(field_data.items())[0]
-        return None if key == 'isNull' else value if converter is None else converter.convert(value)
+        if key == 'isNull':
+            return None
+        if converter is not None:
+            return converter.convert(value)
+        return ARRAY_TO_LIST.convert(value) if key == 'arrayValue' else value
 
     def map_record(self, record):
         return {self.fields[i]: self.map_field(record[i], self.converters[i]) for i in range(0, len(record))}
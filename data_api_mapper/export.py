@@ -0,0 +1,234 @@
+import base64
+import csv
+import gzip
+import io
+import json
+import math
+from dataclasses import dataclass
+from json.encoder import encode_basestring
+
+NON_FINITE_DOUBLES = {math.inf: 'Infinity', -math.inf: '-Infinity'}
+NUMERIC_TYPES = {'numeric', 'decimal'}
+
+
+def json_text(value):
+    return json.dumps(value, ensure_ascii=False)
+
+
+def blob_text(value):
+    return base64.b64encode(value).decode('ascii')
+
+
+class NdjsonCellEncoder:
+
+    @staticmethod
+    def for_type(type_name):
+        if type_name.startswith('_'):
+            return ArrayEncoder(NdjsonCellEncoder.for_type(type_name[1:])).encode
+        if type_name == 'jsonb':
+            return NdjsonCellEncoder.encode_jsonb
+        if type_name == 'json':
+            return NdjsonCellEncoder.encode_json
+        if type_name in NUMERIC_TYPES:
+            return NdjsonCellEncoder.encode_numeric
+        return NdjsonCellEncoder.encode
+
+    @staticmethod
+    def encode(cell):
+        key, value = next(iter(cell.items()))
+        if key == 'isNull':
+            return 'null'
+        if key == 'stringValue':
+            return encode_basestring(value)
+        if key == 'longValue':
+            return str(value)
+        if key == 'booleanValue':
+            return 'true' if value else 'false'
+        if key == 'doubleValue':
+            return NdjsonCellEncoder.encode_double(value)
+        if key == 'blobValue':
+            return encode_basestring(blob_text(value))
+        if key == 'arrayValue':
+            return ArrayEncoder(NdjsonCellEncoder.encode).encode(cell)
+        return json_text(value)
+
+    @staticmethod
+    def encode_double(value):
+        # NaN and Infinity are not valid JSON, they are written as strings like numeric NaN
+        if math.isfinite(value):
+            return repr(value)
+        return encode_basestring(NON_FINITE_DOUBLES.get(value, 'NaN'))
+
+    @staticmethod
+    def encode_jsonb(cell):
+        # jsonb text is canonical single-line JSON, it's copied as it is
+        key, value = next(iter(cell.items()))
+        return value if key == 'stringValue' else NdjsonCellEncoder.encode(cell)
+
+    @staticmethod
+    def encode_json(cell):
+        # json keeps the text as written; raw line breaks can only be whitespace between tokens
+        key, value = next(iter(cell.items()))
+        if key == 'stringValue':
+            return value.replace('\r', ' ').replace('\n', ' ')
+        return NdjsonCellEncoder.encode(cell)
+
+    @staticmethod
+    def encode_numeric(cell):
+        key, value = next(iter(cell.items()))
+        if key == 'stringValue' and value not in ('NaN', 'Infinity', '-Infinity'):
+            return value
+        return NdjsonCellEncoder.encode(cell)
+
+
+class ArrayEncoder:
+
+    # arrays are written as JSON arrays, each element following the rules of its scalar type
+    def __init__(self, element_encoder) -> None:
+        super().__init__()
+        self.element_encoder = element_encoder
+
+    def encode(self, cell):
+        key, value = next(iter(cell.items()))
+        return self.encode_array(value) if key == 'arrayValue' else NdjsonCellEncoder.encode(cell)
+
+    def encode_array(self, value):
+        key, items = next(iter(value.items()))
+        if key == 'arrayValues':
+            return '[' + ','.join([self.encode_array(x) for x in items]) + ']'
+        element_key = key[:-1]
+        encode = self.element_encoder
+        return '[' + ','.join(['null' if x is None else encode({element_key: x}) for x in items]) + ']'
+
+
+class CsvCellEncoder:
+
+    @staticmethod
+    def for_type(type_name):
+        if type_name.startswith('_'):
+            return NdjsonCellEncoder.for_type(type_name)
+        return CsvCellEncoder.encode
+
+    @staticmethod
+    def encode(cell):
+        key, value = next(iter(cell.items()))
+        if key == 'isNull':
+            return ''
+        if key == 'stringValue':
+            return value
+        if key == 'booleanValue':
+            return 'true' if value else 'false'
+        if key == 'blobValue':
+            return blob_text(value)
+        if key == 'arrayValue':
+            return ArrayEncoder(NdjsonCellEncoder.encode).encode(cell)
+        return str(value)
+
+
+class NdjsonFormat:
+
+    def __init__(self, field_names, type_names) -> None:
+        super().__init__()
+        self.prefixes = [('{' if i == 0 else ',') + json_text(x) + ':' for i, x in enumerate(field_names)]
+        self.encoders = [NdjsonCellEncoder.for_type(x) for x in type_names]
+
+    def header(self):
+        return ''
+
+    def page(self, records):
+        prefixes, encoders = self.prefixes, self.encoders
+        lines = [
+            ''.join([prefixes[i] + encoders[i](cell) for i, cell in enumerate(record)]) + '}\n'
+            for record in records
+        ]
+        return ''.join(lines)
+
+
+class CsvFormat:
+
+    def __init__(self, field_names, type_names) -> None:
+        super().__init__()
+        self.field_names = field_names
+        self.encoders = [CsvCellEncoder.for_type(x) for x in type_names]
+
+    def header(self):
+        return self.page_from_rows([self.field_names])
+
+    def page(self, records):
+        encoders = self.encoders
+        return self.page_from_rows([[encoders[i](cell) for i, cell in enumerate(record)] for record in records])
+
+    @staticmethod
+    def page_from_rows(rows):
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator='\n').writerows(rows)
+        return buffer.getvalue()
+
+
+EXPORT_FORMATS = {
+    'ndjson': NdjsonFormat,
+    'csv': CsvFormat,
+}
+
+
+@dataclass
+class ExportStats:
+    rows: int
+    bytes: int
+    elapsed: float
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.elapsed if self.elapsed else None
+
+    @property
+    def bytes_per_second(self):
+        return self.bytes / self.elapsed if self.elapsed else None
+
+
+class ExportWriter:
+
+    def __init__(self, fileobj, compress=False, buffer_size=1024 * 1024, compresslevel=6) -> None:
+        super().__init__()
+        self.text = isinstance(fileobj, io.TextIOBase)
+        if self.text and compress:
+            raise ValueError('gzip output needs a binary file object')
+        self.gzip_file = gzip.GzipFile(fileobj=fileobj, mode='wb', compresslevel=compresslevel) if compress else None
+        target = self.gzip_file if compress else fileobj
+        self.stream = target if self.text else io.BufferedWriter(RawWriter(target), buffer_size)
+        self.bytes = 0
+
+    def write(self, chunk):
+        if not chunk:
+            return
+        if self.text:
+            self.stream.write(chunk)
+            # bytes of the UTF-8 text, whatever the encoding of the file object
+            self.bytes += len(chunk.encode('utf-8'))
+        else:
+            data = chunk.encode('utf-8')
+            self.stream.write(data)
+            self.bytes += len(data)
+
+    def close(self):
+        self.stream.flush()
+        if self.gzip_file is not None:
+            self.gzip_file.close()
+
+
+class RawWriter(io.RawIOBase):
+
+    def __init__(self, target) -> None:
+        super().__init__()
+        self.target = target
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.target.write(data)
+        return len(data)
+
+    def close(self):
+        # the target belongs to the caller, it must stay open
+        pass
@@ -0,0 +1,146 @@
+import bisect
+import json
+import re
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, List, Dict, Any
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r'(?<![\w:.$])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?\b', re.IGNORECASE)
+NAMED_PARAMETER = re.compile(r'(?<!:):[A-Za-z_]\w*')
+IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+WHITESPACE = re.compile(r'\s+')
+
+# upper bounds in seconds, from 0.5ms to ~65s
+DEFAULT_BUCKETS = [0.0005 * (2 ** x) for x in range(0, 18)]
+
+
+class SqlFingerprint:
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def fingerprint(sql):
+        normalized = STRING_LITERAL.sub('?', sql)
+        normalized = NAMED_PARAMETER.sub('?', normalized)
+        normalized = NUMBER_LITERAL.sub('?', normalized)
+        normalized = WHITESPACE.sub(' ', normalized).strip().rstrip(';').strip().lower()
+        return IN_LIST.sub('(?)', normalized)
+
+
+@dataclass
+class QueryEvent:
+    sql: str
+    fingerprint: str
+    transaction_id: Optional[str]
+    parameter_build_time: float
+    network_time: float
+    mapping_time: float
+    record_count: int
+    column_count: int
+    response_bytes: int
+    parameters: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def total_time(self):
+        return self.parameter_build_time + self.network_time + self.mapping_time
+
+    @staticmethod
+    def response_size(response):
+        headers = response.get('ResponseMetadata', {}).get('HTTPHeaders', {})
+        if 'content-length' in headers:
+            return int(headers['content-length'])
+        body = {x: response[x] for x in response.keys() if x != 'ResponseMetadata'}
+        return len(json.dumps(body, default=str))
+
+    @staticmethod
+    def from_response(sql, transaction_id, started, built, received, mapped, response, parameters=None):
+        if 'columnMetadata' in response:
+            record_count, column_count = len(response['records']), len(response['columnMetadata'])
+        elif 'updateResults' in response:
+            record_count, column_count = len(response['updateResults']), 0
+        else:
+            record_count, column_count = response.get('numberOfRecordsUpdated', 0), 0
+        return QueryEvent(
+            sql, SqlFingerprint.fingerprint(sql), transaction_id, built - started, received - built,
+            mapped - received, record_count, column_count, QueryEvent.response_size(response), parameters
+        )
+
+    @staticmethod
+    def from_error(sql, transaction_id, started, built, failed, error, parameters=None):
+        return QueryEvent(
+            sql, SqlFingerprint.fingerprint(sql), transaction_id, built - started, failed - built, 0.0, 0, 0, 0,
+            parameters, error
+        )
+
+
+class Histogram:
+
+    def __init__(self, buckets=None) -> None:
+        super().__init__()
+        self.buckets = list(buckets) if buckets is not None else DEFAULT_BUCKETS
+        self.counts = [0 for _ in range(0, len(self.buckets) + 1)]
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def percentile(self, q):
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count > 0:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count, 'sum': self.sum, 'max': self.max,
+            'p50': self.percentile(0.5), 'p95': self.percentile(0.95), 'p99': self.percentile(0.99)
+        }
+
+
+class HistogramCollector:
+
+    PHASES = ['parameter_build_time', 'network_time', 'mapping_time', 'total_time', 'response_bytes', 'record_count']
+
+    def __init__(self, buckets=None, by_fingerprint=False) -> None:
+        super().__init__()
+        self.buckets = buckets
+        self.by_fingerprint = by_fingerprint
+        self.histograms: Dict[str, Dict[str, Histogram]] = {}
+        self.lock = threading.Lock()
+
+    def _histograms_for(self, key):
+        if key not in self.histograms:
+            self.histograms[key] = {
+                x: Histogram(self.buckets if x.endswith('_time') else [2 ** y for y in range(0, 32)])
+                for x in self.PHASES
+            }
+        return self.histograms[key]
+
+    def __call__(self, event: QueryEvent):
+        key = event.fingerprint if self.by_fingerprint else '*'
+        with self.lock:
+            histograms = self._histograms_for(key)
+            for phase in self.PHASES:
+                histograms[phase].observe(getattr(event, phase))
+
+    def keys(self) -> List[str]:
+        return list(self.histograms.keys())
+
+    def histogram(self, phase, key='*') -> Histogram:
+        return self.histograms[key][phase]
+
+    def to_dict(self):
+        with self.lock:
+            return {k: {x: h.to_dict() for x, h in v.items()} for k, v in self.histograms.items()}
@@ -0,0 +1,164 @@
+import random
+import re
+import threading
+import time
+
+RETRYABLE_ERROR_CODES = {
+    'StatementTimeoutException',
+    'ServiceUnavailableError',
+    'InternalServerErrorException',
+    'ThrottlingException',
+    'TooManyRequestsException',
+    'DatabaseResumingException',
+    'DatabaseUnavailableException',
+}
+
+RETRYABLE_ERROR_MESSAGES = (
+    'communications link failure',
+    'is resuming after being auto-paused',
+    'database is resuming',
+    'connection was closed',
+)
+
+IDEMPOTENT_STATEMENT = re.compile(r'^\s*(\(\s*)*(select|show|explain|values)\b', re.IGNORECASE)
+# `into` catches SELECT ... INTO, which creates a table
+WRITE_KEYWORD = re.compile(
+    r'\b(insert|into|update|delete|merge|create|drop|alter|truncate|grant|revoke|call|do)\b', re.IGNORECASE
+)
+WITH_STATEMENT = re.compile(r'^\s*with\b', re.IGNORECASE)
+
+
+class RetryError(Exception):
+
+    def __init__(self, message, attempts, last_error) -> None:
+        super().__init__(message)
+        self.attempts = attempts
+        self.last_error = last_error
+
+
+class ErrorClassifier:
+
+    @staticmethod
+    def error_code(error):
+        response = getattr(error, 'response', None)
+        if isinstance(response, dict):
+            return response.get('Error', {}).get('Code')
+        return None
+
+    @staticmethod
+    def error_message(error):
+        response = getattr(error, 'response', None)
+        if isinstance(response, dict):
+            message = response.get('Error', {}).get('Message')
+            if message:
+                return message
+        return str(error)
+
+    @classmethod
+    def is_retryable(cls, error):
+        if cls.error_code(error) in RETRYABLE_ERROR_CODES:
+            return True
+        message = cls.error_message(error).lower()
+        return any(x in message for x in RETRYABLE_ERROR_MESSAGES)
+
+
+class StatementClassifier:
+
+    @staticmethod
+    def is_idempotent(sql):
+        if IDEMPOTENT_STATEMENT.match(sql):
+            return WRITE_KEYWORD.search(sql) is None
+        if WITH_STATEMENT.match(sql):
+            return WRITE_KEYWORD.search(sql) is None
+        return False
+
+
+class RetryPolicy:
+
+    def __init__(self, max_attempts=5, base_delay=0.1, max_delay=5.0, deadline=30.0, retry_writes=False,
+                 retry_in_transaction=False, classifier=ErrorClassifier, sleep=time.sleep, clock=time.monotonic,
+                 rand=random.random) -> None:
+        super().__init__()
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.retry_writes = retry_writes
+        self.retry_in_transaction = retry_in_transaction
+        self.classifier = classifier
+        self.sleep = sleep
+        self.clock = clock
+        self.rand = rand
+
+    def backoff(self, attempt):
+        # "full jitter": uniform in [0, min(max_delay, base * 2^attempt)]
+        return self.rand() * min(self.max_delay, self.base_delay * (2 ** attempt))
+
+    def can_retry(self, config):
+        # after a link failure or a timeout the transaction may already be aborted
+        if 'transactionId' in config and not self.retry_in_transaction:
+            return False
+        return self.retry_writes or StatementClassifier.is_idempotent(config['sql'])
+
+    def call(self, function, config):
+        if not self.can_retry(config):
+            return function(**config)
+        started = self.clock()
+        attempt = 0
+        while True:
+            try:
+                return function(**config)
+            except Exception as error:
+                attempt += 1
+                if not self.classifier.is_retryable(error):
+                    raise
+                if self.max_attempts is not None and attempt >= self.max_attempts:
+                    raise RetryError(f'Giving up after {attempt} attempts', attempt, error) from error
+                delay = self.backoff(attempt - 1)
+                if self.deadline is not None and self.clock() - started + delay > self.deadline:
+                    raise RetryError(f'Deadline of {self.deadline}s exceeded after {attempt} attempts',
+                                     attempt, error) from error
+                self.sleep(delay)
+
+
+class KeepAlive:
+
+    def __init__(self, data_client, interval=240.0, sql='SELECT 1') -> None:
+        super().__init__()
+        self.data_client = data_client
+        self.interval = interval
+        self.sql = sql
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def ping(self):
+        try:
+            self.data_client.query(self.sql)
+            self.last_error = None
+        except Exception as error:
+            self.last_error = error
+        return self.last_error is None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.ping()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='data-api-keep-alive', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
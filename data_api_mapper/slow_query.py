@@ -0,0 +1,153 @@
+import json
+import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Deque, List, Optional
+
+from data_api_mapper.instrumentation import QueryEvent
+
+EXPLAINABLE_STATEMENT = re.compile(r'^\s*(\(\s*)*(select|with|insert|update|delete|values)\b', re.IGNORECASE)
+REPORT_ORDER_KEYS = ['total_time', 'count', 'mean_time', 'max_time', 'slow_count', 'p50', 'p95', 'p99']
+SAVEPOINT = 'data_api_mapper_explain'
+
+
+@dataclass
+class FingerprintStats:
+    fingerprint: str
+    sample_sql: str
+    count: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    slow_count: int = 0
+    latencies: Deque[float] = field(default_factory=deque)
+    plan: Optional[Any] = None
+    plan_error: Optional[str] = None
+    explaining: bool = False
+    explain_attempts: int = 0
+    explainable: bool = True
+
+    def percentile(self, q):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def to_dict(self):
+        return {
+            'fingerprint': self.fingerprint, 'sample_sql': self.sample_sql, 'count': self.count,
+            'total_time': self.total_time, 'mean_time': self.total_time / self.count if self.count else 0.0,
+            'max_time': self.max_time, 'slow_count': self.slow_count,
+            'p50': self.percentile(0.5), 'p95': self.percentile(0.95), 'p99': self.percentile(0.99),
+            'plan': self.plan, 'plan_error': self.plan_error
+        }
+
+
+class SlowQueryLog:
+
+    def __init__(self, data_client, threshold=0.5, window=1000, explain=True, background=True,
+                 explain_in_transaction=False, max_explain_attempts=3) -> None:
+        super().__init__()
+        self.data_client = data_client
+        self.threshold = threshold
+        self.window = window
+        self.explain = explain
+        self.background = background
+        self.explain_in_transaction = explain_in_transaction
+        self.max_explain_attempts = max_explain_attempts
+        self.stats = {}
+        self.lock = threading.Lock()
+        self._executor = None
+
+    def _can_explain(self, stats, event):
+        if not self.explain or event.error is not None:
+            return False
+        if event.transaction_id is not None and not self.explain_in_transaction:
+            return False
+        return (stats.explainable and stats.plan is None and not stats.explaining
+                and stats.explain_attempts < self.max_explain_attempts)
+
+    def __call__(self, event: QueryEvent):
+        elapsed = event.total_time
+        slow = elapsed >= self.threshold
+        with self.lock:
+            stats = self.stats.get(event.fingerprint)
+            if stats is None:
+                stats = FingerprintStats(event.fingerprint, event.sql, latencies=deque(maxlen=self.window))
+                self.stats[event.fingerprint] = stats
+            stats.count += 1
+            stats.total_time += elapsed
+            stats.max_time = max(stats.max_time, elapsed)
+            stats.latencies.append(elapsed)
+            must_explain = slow and self._can_explain(stats, event)
+            if slow:
+                stats.slow_count += 1
+                stats.sample_sql = event.sql
+            if must_explain:
+                # reserve the fingerprint so concurrent slow calls don't explain it again
+                stats.explaining = True
+                stats.explain_attempts += 1
+        if must_explain:
+            # inside a transaction the plan is taken inline: the transaction may be gone before a worker runs
+            if self.background and event.transaction_id is None:
+                self._get_executor().submit(self._explain, stats, event)
+            else:
+                self._explain(stats, event)
+
+    def _get_executor(self):
+        with self.lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='data-api-explain')
+            return self._executor
+
+    def _run(self, sql, parameters, transaction_id):
+        # no listeners: the EXPLAIN must not show up in any collector, this one included
+        return self.data_client._query(sql, parameters, None, transaction_id, [])
+
+    def _explain_statement(self, event):
+        explain_sql = f'EXPLAIN (FORMAT JSON) {event.sql}'
+        if event.transaction_id is None:
+            return self._run(explain_sql, event.parameters, None)
+        # a failing EXPLAIN must not abort the caller's transaction
+        self._run(f'SAVEPOINT {SAVEPOINT}', None, event.transaction_id)
+        try:
+            result = self._run(explain_sql, event.parameters, event.transaction_id)
+        except Exception:
+            self._run(f'ROLLBACK TO SAVEPOINT {SAVEPOINT}', None, event.transaction_id)
+            raise
+        self._run(f'RELEASE SAVEPOINT {SAVEPOINT}', None, event.transaction_id)
+        return result
+
+    def _explain(self, stats, event):
+        plan, plan_error, explainable = None, None, True
+        if not EXPLAINABLE_STATEMENT.match(event.sql):
+            plan_error, explainable = 'not explainable', False
+        else:
+            try:
+                result = self._explain_statement(event)
+                plan = list(result[0].values())[0]
+                plan = json.loads(plan) if isinstance(plan, str) else plan
+            except Exception as error:
+                # kept for the report, the fingerprint is explained again on its next slow call
+                plan_error = str(error)
+        with self.lock:
+            stats.plan, stats.plan_error, stats.explainable, stats.explaining = plan, plan_error, explainable, False
+
+    def report(self, top=10, order_by='total_time') -> List[dict]:
+        if order_by not in REPORT_ORDER_KEYS:
+            raise ValueError(f'Unknown order_by {order_by}, expected one of {REPORT_ORDER_KEYS}')
+        with self.lock:
+            stats = [x.to_dict() for x in self.stats.values()]
+        stats.sort(key=lambda x: x[order_by] if x[order_by] is not None else -1, reverse=True)
+        return stats[:top]
+
+    def reset(self):
+        with self.lock:
+            self.stats = {}
+
+    def close(self):
+        with self.lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
@@ -14,6 +14,6 @@ setup(
         'License :: OSI Approved :: MIT License',
         'Programming Language :: Python :: 3.8',
     ],
-    packages=find_packages(exclude=['test']),
+    packages=find_packages(exclude=['test', 'benchmarks', 'benchmarks.*']),
     test_suite='test'
 )
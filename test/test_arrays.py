@@ -0,0 +1,89 @@
+import unittest
+from array import array
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from data_api_mapper.converters import POSTGRES_PYTHON_MAPPER, POSTGRES_PYTHON_COMPACT_ARRAY_MAPPER
+from data_api_mapper.data_api import DictionaryMapper, ParameterBuilder, QueryResponse
+from data_api_mapper.export import NdjsonCellEncoder, CsvCellEncoder
+
+
+def build_response(type_names, record):
+    return QueryResponse.from_dict({
+        'columnMetadata': [{'name': f'c{i}', 'tableName': 't', 'typeName': x, 'nullable': 1}
+                           for i, x in enumerate(type_names)],
+        'records': [record]
+    })
+
+
+class TestArrays(unittest.TestCase):
+
+    def test_map_arrays(self):
+        response = build_response(['_int4', '_float8', '_text', '_numeric', '_timestamptz', '_int4', '_uuid'], [
+            {'arrayValue': {'longValues': [1, 2, 3]}},
+            {'arrayValue': {'doubleValues': [1.5, 2.5]}},
+            {'arrayValue': {'stringValues': ['a', 'b']}},
+            {'arrayValue': {'stringValues': ['1.10', '2.20']}},
+            {'arrayValue': {'stringValues': ['2021-03-03 15:51:48.082288']}},
+            {'isNull': True},
+            {'arrayValue': {'stringValues': ['4169f39a-db3a-4058-a907-3aa6684de0b2']}},
+        ])
+        row = DictionaryMapper(response.metadata, POSTGRES_PYTHON_MAPPER).map(response.records)[0]
+        self.assertEqual([1, 2, 3], row['c0'])
+        self.assertEqual([1.5, 2.5], row['c1'])
+        self.assertEqual(['a', 'b'], row['c2'])
+        self.assertEqual([Decimal('1.10'), Decimal('2.20')], row['c3'])
+        self.assertEqual([datetime(2021, 3, 3, 15, 51, 48, 82288, tzinfo=timezone.utc)], row['c4'])
+        self.assertIsNone(row['c5'])
+        self.assertEqual(['4169f39a-db3a-4058-a907-3aa6684de0b2'], row['c6'])
+
+    def test_nested_arrays(self):
+        response = build_response(['_int4'], [
+            {'arrayValue': {'arrayValues': [{'longValues': [1, 2]}, {'longValues': [3, 4]}]}}
+        ])
+        self.assertEqual([[1, 2], [3, 4]], DictionaryMapper(response.metadata).map(response.records)[0]['c0'])
+        compact = DictionaryMapper(response.metadata, POSTGRES_PYTHON_COMPACT_ARRAY_MAPPER).map(response.records)
+        self.assertEqual([array('i', [1, 2]), array('i', [3, 4])], compact[0]['c0'])
+
+    def test_compact_arrays(self):
+        response = build_response(['_int8', '_float8', '_text'], [
+            {'arrayValue': {'longValues': [1, 2 ** 40]}},
+            {'arrayValue': {'doubleValues': [1.5, 2.5]}},
+            {'arrayValue': {'stringValues': ['a']}},
+        ])
+        row = DictionaryMapper(response.metadata, POSTGRES_PYTHON_COMPACT_ARRAY_MAPPER).map(response.records)[0]
+        self.assertEqual(array('q', [1, 2 ** 40]), row['c0'])
+        self.assertEqual(array('d', [1.5, 2.5]), row['c1'])
+        self.assertEqual(['a'], row['c2'])
+
+    def test_array_parameters(self):
+        builder = ParameterBuilder()
+        builder.add_array('texts', ['a', 'with "quotes"', 'back\\slash', None])
+        builder.add('ints', array('i', [1, 2, 3]))
+        builder.from_query([{'name': 'nested', 'value': [[1, 2], [3, 4]], 'array': True},
+                            {'name': 'json', 'value': [1, 2]}])
+        parameters = builder.build()
+        self.assertEqual('{"a","with \\"quotes\\"","back\\\\slash",NULL}', parameters[0]['value']['stringValue'])
+        self.assertEqual('{1,2,3}', parameters[1]['value']['stringValue'])
+        self.assertEqual('{{1,2},{3,4}}', parameters[2]['value']['stringValue'])
+        self.assertEqual('JSON', parameters[3]['typeHint'])
+
+    def test_compact_arrays_reject_null_elements(self):
+        response = build_response(['_int4'], [{'arrayValue': {'longValues': [1, None]}}])
+        with self.assertRaises(ValueError):
+            DictionaryMapper(response.metadata, POSTGRES_PYTHON_COMPACT_ARRAY_MAPPER).map(response.records)
+        self.assertEqual([1, None], DictionaryMapper(response.metadata, POSTGRES_PYTHON_MAPPER)
+                         .map(response.records)[0]['c0'])
+
+    def test_export_arrays(self):
+        nested = {'arrayValue': {'arrayValues': [{'longValues': [1, 2]}, {'longValues': [3]}]}}
+        self.assertEqual('[[1,2],[3]]', NdjsonCellEncoder.for_type('_int4')(nested))
+        self.assertEqual('[[1,2],[3]]', CsvCellEncoder.for_type('_int4')(nested))
+        jsonb = {'arrayValue': {'stringValues': ['{"a": 1}', '[2]']}}
+        self.assertEqual('[{"a": 1},[2]]', NdjsonCellEncoder.for_type('_jsonb')(jsonb))
+        numeric = {'arrayValue': {'stringValues': ['1.10', 'NaN']}}
+        self.assertEqual('[1.10,"NaN"]', NdjsonCellEncoder.for_type('_numeric')(numeric))
+        doubles = {'arrayValue': {'doubleValues': [1.5, float('inf')]}}
+        self.assertEqual('[1.5,"Infinity"]', NdjsonCellEncoder.for_type('_float8')(doubles))
+        texts = {'arrayValue': {'stringValues': ['a "b"', None]}}
+        self.assertEqual('["a \\"b\\"",null]', NdjsonCellEncoder.for_type('_text')(texts))
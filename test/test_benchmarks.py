@@ -0,0 +1,31 @@
+import unittest
+
+from benchmarks import FakeRdsDataClient, ColumnSpec
+from benchmarks.scenarios import SCENARIOS
+from data_api_mapper import DataAPIClient
+
+
+class TestFakeRdsDataClient(unittest.TestCase):
+
+    def test_shape(self):
+        columns = [ColumnSpec('id', 'int4'), ColumnSpec('doc', 'jsonb', 1.0), ColumnSpec('ts', 'timestamptz')]
+        client = DataAPIClient(FakeRdsDataClient(10, columns), 'secret', 'cluster', 'db')
+        result = client.query('select * from bench')
+        self.assertEqual(10, len(result))
+        self.assertEqual(['id', 'doc', 'ts'], list(result[0].keys()))
+        self.assertIsNone(result[0]['doc'])
+        self.assertIsNotNone(result[0]['ts'].tzinfo)
+
+    def test_pagination(self):
+        client = DataAPIClient(FakeRdsDataClient(250), 'secret', 'cluster', 'db')
+        result = client.query_paginated('select * from bench', page_size=100)
+        self.assertEqual(list(range(0, 250)), [x['id'] for x in result])
+        self.assertEqual(3, client.rds_client.calls)
+
+    def test_deterministic(self):
+        self.assertEqual(FakeRdsDataClient(50, seed=1).records, FakeRdsDataClient(50, seed=1).records)
+
+    def test_scenarios_run(self):
+        for name, build in SCENARIOS.items():
+            run, rows = build(5, 0.0)
+            run()
@@ -0,0 +1,99 @@
+import csv
+import gzip
+import io
+import json
+import unittest
+from decimal import Decimal
+
+from benchmarks import FakeRdsDataClient, ColumnSpec
+from data_api_mapper import DataAPIClient
+from data_api_mapper.export import NdjsonFormat
+
+COLUMNS = [
+    ColumnSpec('id', 'int4'), ColumnSpec('a_name', 'text', 0.2), ColumnSpec('doc', 'jsonb', 0.2),
+    ColumnSpec('num_numeric', 'numeric', 0.2), ColumnSpec('num_float', 'float8', 0.2),
+    ColumnSpec('ts', 'timestamptz', 0.2), ColumnSpec('field_boolean', 'bool', 0.2),
+]
+
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self):
+        self.client = DataAPIClient(FakeRdsDataClient(250, COLUMNS), 'secret', 'cluster', 'db')
+        self.expected = self.client.query('select * from bench')
+
+    def test_ndjson(self):
+        output = io.BytesIO()
+        stats = self.client.export('select * from bench', output, 'ndjson', page_size=100)
+        self.assertEqual(250, stats.rows)
+        self.assertEqual(len(output.getvalue()), stats.bytes)
+        rows = [json.loads(x, parse_float=Decimal) for x in output.getvalue().decode('utf-8').splitlines()]
+        self.assertEqual(250, len(rows))
+        for row, expected in zip(rows, self.expected):
+            self.assertEqual(expected['id'], row['id'])
+            self.assertEqual(expected['a_name'], row['a_name'])
+            self.assertEqual(json.loads(json.dumps(expected['doc']), parse_float=Decimal), row['doc'])
+            self.assertEqual(expected['num_numeric'], row['num_numeric'])
+            self.assertEqual(expected['field_boolean'], row['field_boolean'])
+            self.assertEqual(expected['ts'] is None, row['ts'] is None)
+
+    def test_csv_gzip(self):
+        output = io.BytesIO()
+        progress = []
+        stats = self.client.export('select * from bench', output, 'csv', page_size=100, compress=True,
+                                   progress=progress.append)
+        self.assertEqual([100, 200, 250], [x.rows for x in progress])
+        text = gzip.decompress(output.getvalue()).decode('utf-8')
+        self.assertEqual(len(text.encode('utf-8')), stats.bytes)
+        rows = list(csv.reader(io.StringIO(text)))
+        self.assertEqual([x.name for x in COLUMNS], rows[0])
+        self.assertEqual(251, len(rows))
+        self.assertEqual([str(x['id']) for x in self.expected], [x[0] for x in rows[1:]])
+        self.assertEqual(['' if x['a_name'] is None else x['a_name'] for x in self.expected], [x[1] for x in rows[1:]])
+
+    def test_text_output_and_empty_result(self):
+        client = DataAPIClient(FakeRdsDataClient(0, COLUMNS), 'secret', 'cluster', 'db')
+        output = io.StringIO()
+        stats = client.export('select * from bench', output, 'csv')
+        self.assertEqual(0, stats.rows)
+        self.assertEqual('id,a_name,doc,num_numeric,num_float,ts,field_boolean\n', output.getvalue())
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            self.client.export('select * from bench', io.BytesIO(), 'xml')
+
+    def test_ndjson_json_and_non_finite_doubles(self):
+        page = NdjsonFormat(['j', 'b', 'f', 'g', 'h'], ['json', 'jsonb', 'float8', 'float8', 'float8']).page([[
+            {'stringValue': '{\n  "a": "x\\ny",\r\n  "b": 1\n}'}, {'stringValue': '{"c": [1, 2]}'},
+            {'doubleValue': float('nan')}, {'doubleValue': float('-inf')}, {'doubleValue': 1.5}
+        ]])
+        lines = page.splitlines()
+        self.assertEqual(1, len(lines))
+        self.assertEqual({'j': {'a': 'x\ny', 'b': 1}, 'b': {'c': [1, 2]}, 'f': 'NaN', 'g': '-Infinity', 'h': 1.5},
+                         json.loads(lines[0]))
+
+    def test_text_output_counts_utf8_bytes(self):
+        client = DataAPIClient(FakeRdsDataClient(0, [ColumnSpec('ñandú €', 'text')]), 'secret', 'cluster', 'db')
+        output = io.StringIO()
+        stats = client.export('select * from bench', output, 'csv')
+        self.assertEqual(len(output.getvalue().encode('utf-8')), stats.bytes)
+        self.assertGreater(stats.bytes, len(output.getvalue()))
+
+    def test_compresslevel(self):
+        # byte 8 of the gzip header is 2 for the best compression and 0 for intermediate levels
+        output = io.BytesIO()
+        self.client.export('select * from bench', output, compress=True)
+        self.assertEqual(0, output.getvalue()[8])
+        output = io.BytesIO()
+        self.client.export('select * from bench', output, compress=True, compresslevel=9)
+        self.assertEqual(2, output.getvalue()[8])
+
+    def test_gzip_is_finished_when_a_page_fails(self):
+        def fail_next_page(stats):
+            self.client.rds_client.failures.append(ValueError('connection lost'))
+
+        output = io.BytesIO()
+        with self.assertRaises(ValueError):
+            self.client.export('select * from bench', output, 'csv', page_size=100, compress=True,
+                               progress=fail_next_page)
+        self.assertEqual(101, len(gzip.decompress(output.getvalue()).decode('utf-8').splitlines()))
@@ -0,0 +1,115 @@
+import unittest
+
+from benchmarks import FakeRdsDataClient, ColumnSpec
+from data_api_mapper import DataAPIClient, HistogramCollector
+from data_api_mapper.instrumentation import SqlFingerprint, Histogram
+
+
+class SizedRdsDataClient(FakeRdsDataClient):
+
+    def __init__(self, failures=()) -> None:
+        super().__init__(2, [ColumnSpec('id', 'int4'), ColumnSpec('doc', 'jsonb')], failures=failures)
+
+    def execute_statement(self, **kwargs):
+        response = super().execute_statement(**kwargs)
+        if 'records' in response:
+            response = dict(response, ResponseMetadata={'HTTPHeaders': {'content-length': '321'}})
+        return response
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def test_fingerprint(self):
+        self.assertEqual(
+            'select * from t where id in (?) and name = ? and x = ?',
+            SqlFingerprint.fingerprint("SELECT *  FROM t\n WHERE id IN (1, 2, 3) AND name = 'it''s' and x = :x;")
+        )
+        self.assertEqual('select a::int4 from t1', SqlFingerprint.fingerprint('select a::int4 from t1'))
+
+    def test_events(self):
+        events = []
+        client = DataAPIClient(SizedRdsDataClient(), 'secret', 'cluster', 'db')
+        client.add_listener(events.append)
+        client.query('select * from t where id = :id', {'id': 1})
+        client.query('update t set a = 1')
+        client.batch_query('insert into t values (:id)', [{'id': 1}, {'id': 2}])
+        self.assertEqual(3, len(events))
+        select = events[0]
+        self.assertEqual('select * from t where id = ?', select.fingerprint)
+        self.assertEqual((2, 2, 321), (select.record_count, select.column_count, select.response_bytes))
+        self.assertIsNone(select.transaction_id)
+        self.assertGreaterEqual(select.mapping_time, 0)
+        self.assertEqual(1, events[1].record_count)
+        self.assertEqual(2, events[2].record_count)
+        self.assertGreater(events[2].response_bytes, 0)
+
+    def test_transaction_listeners(self):
+        client_events, tx_events = [], []
+        client = DataAPIClient(SizedRdsDataClient(), 'secret', 'cluster', 'db')
+        client.add_listener(client_events.append)
+        transaction = client.begin_transaction()
+        transaction.add_listener(tx_events.append)
+        transaction.query('select * from t')
+        client.query('select * from t')
+        self.assertEqual(2, len(client_events))
+        self.assertEqual(1, len(tx_events))
+        self.assertEqual(transaction.transaction_id, tx_events[0].transaction_id)
+        self.assertIsNotNone(transaction.transaction_id)
+
+    def test_no_listeners(self):
+        client = DataAPIClient(SizedRdsDataClient(), 'secret', 'cluster', 'db')
+        listener = client.add_listener(lambda x: None)
+        client.remove_listener(listener)
+        self.assertEqual([], client.listeners)
+        self.assertEqual(2, len(client.query('select * from t')))
+
+    def test_failing_listener_does_not_change_the_result(self):
+        def failing(event):
+            raise RuntimeError('listener bug')
+        events = []
+        client = DataAPIClient(SizedRdsDataClient(), 'secret', 'cluster', 'db')
+        client.add_listener(failing)
+        client.add_listener(events.append)
+        with self.assertLogs('data_api_mapper.data_api', level='ERROR'):
+            self.assertEqual(2, len(client.query('select * from t')))
+        self.assertEqual(1, len(events))
+
+    def test_failed_statement_event(self):
+        events = []
+        client = DataAPIClient(SizedRdsDataClient([ValueError('syntax error')]), 'secret', 'cluster', 'db')
+        client.add_listener(events.append)
+        with self.assertRaises(ValueError):
+            client.query('select broken from t where id = 1')
+        self.assertEqual(1, len(events))
+        self.assertIsInstance(events[0].error, ValueError)
+        self.assertEqual('select broken from t where id = ?', events[0].fingerprint)
+        self.assertEqual(0, events[0].record_count)
+
+    def test_batch_query_accepts_iterables(self):
+        client = DataAPIClient(SizedRdsDataClient(), 'secret', 'cluster', 'db')
+        response = client.batch_query('insert into t values (:id)', ({'id': x} for x in range(0, 3)))
+        self.assertEqual(3, len(response['updateResults']))
+        events = []
+        client.add_listener(events.append)
+        client.batch_query('insert into t values (:id)', ({'id': x} for x in range(0, 3)))
+        self.assertEqual({'id': 0}, events[0].parameters)
+        self.assertEqual(3, events[0].record_count)
+
+    def test_histogram_collector(self):
+        collector = HistogramCollector(by_fingerprint=True)
+        client = DataAPIClient(SizedRdsDataClient(), 'secret', 'cluster', 'db')
+        client.add_listener(collector)
+        for x in range(0, 10):
+            client.query(f'select * from t where id = {x}')
+        self.assertEqual(['select * from t where id = ?'], collector.keys())
+        self.assertEqual(10, collector.histogram('network_time', 'select * from t where id = ?').count)
+        report = collector.to_dict()['select * from t where id = ?']
+        self.assertEqual(20, report['record_count']['sum'])
+
+    def test_histogram_percentile(self):
+        histogram = Histogram([1, 2, 4, 8])
+        for x in [0.5, 1.5, 1.5, 3, 100]:
+            histogram.observe(x)
+        self.assertEqual(2, histogram.percentile(0.5))
+        self.assertEqual(100, histogram.percentile(1.0))
+        self.assertIsNone(Histogram().percentile(0.5))
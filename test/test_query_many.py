@@ -0,0 +1,94 @@
+import threading
+import unittest
+
+from benchmarks import FakeRdsDataClient
+from data_api_mapper import DataAPIClient
+
+
+class FailingRdsDataClient(FakeRdsDataClient):
+
+    def execute_statement(self, **kwargs):
+        if 'broken' in kwargs['sql']:
+            raise ValueError('syntax error')
+        return super().execute_statement(**kwargs)
+
+
+class TestQueryMany(unittest.TestCase):
+
+    def setUp(self):
+        self.client = DataAPIClient(FailingRdsDataClient(10, latency=0.05), 'secret', 'cluster', 'db')
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_order_and_errors(self):
+        statements = [
+            ('select * from bench limit 1',),
+            ('select broken',),
+            ('select * from bench limit 3', None),
+            ('update bench set a = 1', {'id': 1}, None),
+        ]
+        results = self.client.query_many(statements, max_workers=4)
+        self.assertEqual([True, False, True, True], [x.ok for x in results])
+        self.assertEqual(1, len(results[0].get()))
+        self.assertIsInstance(results[1].error, ValueError)
+        with self.assertRaises(ValueError):
+            results[1].get()
+        self.assertEqual(3, len(results[2].value))
+        self.assertEqual(1, results[3].value)
+
+    def test_runs_concurrently(self):
+        results = self.client.query_many([('select * from bench',) for _ in range(0, 8)], max_workers=4)
+        self.assertTrue(all(x.ok for x in results))
+        self.assertGreater(self.client.rds_client.peak_in_flight, 1)
+        self.assertLessEqual(self.client.rds_client.peak_in_flight, 4)
+
+    def test_concurrent_callers(self):
+        results, errors = {}, []
+
+        def call(max_workers):
+            try:
+                statements = [(f'select * from bench limit {max_workers}',) for _ in range(0, 6)]
+                results[max_workers] = self.client.query_many(statements, max_workers=max_workers)
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=call, args=(x,)) for x in (2, 3, 4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([], errors)
+        for max_workers, result in results.items():
+            self.assertEqual([max_workers] * 6, [len(x.get()) for x in result])
+        self.assertLessEqual(self.client.rds_client.peak_in_flight, self.client.max_workers)
+
+    def test_deadline_cancels_pending(self):
+        results = self.client.query_many([('select * from bench',) for _ in range(0, 4)], max_workers=1,
+                                         timeout=0.02)
+        self.assertTrue(all(isinstance(x.error, TimeoutError) for x in results))
+        self.assertFalse(results[0].cancelled)
+        self.assertTrue(all(x.cancelled for x in results[1:]))
+
+    def test_executor_is_reused(self):
+        self.client.query_many([('select 1',)], max_workers=2)
+        executor = self.client._executor
+        self.client.query_many([('select 1',)], max_workers=3)
+        self.assertIs(executor, self.client._executor)
+
+    def test_empty(self):
+        self.assertEqual([], self.client.query_many([]))
+
+    def test_max_workers_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            self.client.query_many([('select 1',)], max_workers=0)
+        with self.assertRaises(ValueError):
+            self.client.query_many([('select 1',)], max_workers=-1)
+
+    def test_close_while_running(self):
+        closer = threading.Timer(0.02, self.client.close)
+        closer.start()
+        results = self.client.query_many([('select * from bench',) for _ in range(0, 4)], max_workers=1, timeout=5)
+        closer.join()
+        self.assertTrue(results[0].ok)
+        self.assertTrue(all(isinstance(x.error, RuntimeError) and x.cancelled for x in results[1:]))
@@ -0,0 +1,113 @@
+import unittest
+
+from benchmarks import FakeRdsDataClient, ColumnSpec
+from data_api_mapper import DataAPIClient
+from data_api_mapper.retry import RetryPolicy, RetryError, ErrorClassifier, StatementClassifier
+
+
+class FakeClientError(Exception):
+
+    def __init__(self, code, message) -> None:
+        super().__init__(message)
+        self.response = {'Error': {'Code': code, 'Message': message}}
+
+
+def communications_failure():
+    return FakeClientError('BadRequestException', 'Communications link failure\n\nThe last packet sent ...')
+
+
+def fake_client(failures=()):
+    return FakeRdsDataClient(1, [ColumnSpec('id', 'int4')], failures=failures)
+
+
+def build_client(rds_client, **kwargs):
+    sleeps = []
+    policy = RetryPolicy(sleep=sleeps.append, clock=lambda: sum(sleeps), rand=lambda: 1.0, **kwargs)
+    return DataAPIClient(rds_client, 'secret', 'cluster', 'db', retry_policy=policy), sleeps
+
+
+class TestRetry(unittest.TestCase):
+
+    def test_classifier(self):
+        self.assertTrue(ErrorClassifier.is_retryable(communications_failure()))
+        self.assertTrue(ErrorClassifier.is_retryable(FakeClientError('StatementTimeoutException', 'timeout')))
+        self.assertFalse(ErrorClassifier.is_retryable(FakeClientError('BadRequestException', 'syntax error')))
+        self.assertTrue(StatementClassifier.is_idempotent('  select * from a'))
+        self.assertTrue(StatementClassifier.is_idempotent('with x as (select 1) select * from x'))
+        self.assertFalse(StatementClassifier.is_idempotent('with x as (delete from a returning *) select * from x'))
+        self.assertFalse(StatementClassifier.is_idempotent('insert into a values (1)'))
+        self.assertFalse(StatementClassifier.is_idempotent('select * into new_table from a'))
+
+    def test_retries_select_with_backoff(self):
+        rds_client = fake_client([communications_failure(), communications_failure()])
+        client, sleeps = build_client(rds_client, base_delay=0.1)
+        self.assertEqual([{'id': 0}], client.query('select id from t'))
+        self.assertEqual(3, rds_client.calls)
+        self.assertEqual([0.1, 0.2], sleeps)
+
+    def test_gives_up_after_max_attempts(self):
+        rds_client = fake_client([communications_failure() for _ in range(5)])
+        client, _ = build_client(rds_client, max_attempts=3)
+        with self.assertRaises(RetryError) as context:
+            client.query('select id from t')
+        self.assertEqual(3, context.exception.attempts)
+        self.assertEqual(3, rds_client.calls)
+
+    def test_deadline(self):
+        rds_client = fake_client([communications_failure() for _ in range(5)])
+        client, sleeps = build_client(rds_client, base_delay=1.0, deadline=2.5)
+        with self.assertRaises(RetryError):
+            client.query('select id from t')
+        self.assertEqual([1.0], sleeps)
+
+    def test_non_retryable_error_is_raised(self):
+        rds_client = fake_client([FakeClientError('BadRequestException', 'syntax error')])
+        client, _ = build_client(rds_client)
+        with self.assertRaises(FakeClientError):
+            client.query('select id from t')
+        self.assertEqual(1, rds_client.calls)
+
+    def test_writes_are_not_retried_by_default(self):
+        rds_client = fake_client([communications_failure()])
+        client, _ = build_client(rds_client)
+        with self.assertRaises(FakeClientError):
+            client.query('insert into t values (1)')
+        rds_client.failures.append(communications_failure())
+        with self.assertRaises(FakeClientError):
+            client.batch_query('insert into t values (:id)', [{'id': 0}])
+
+    def test_writes_retried_when_opted_in(self):
+        rds_client = fake_client([communications_failure()])
+        client, _ = build_client(rds_client, retry_writes=True)
+        self.assertEqual(1, client.query('insert into t values (1)'))
+        self.assertEqual(2, rds_client.calls)
+
+    def test_transactions_are_not_retried_by_default(self):
+        rds_client = fake_client()
+        client, _ = build_client(rds_client)
+        transaction = client.begin_transaction()
+        rds_client.failures.append(communications_failure())
+        with self.assertRaises(FakeClientError):
+            transaction.query('select id from t')
+        self.assertEqual(1, len(rds_client.statements))
+
+    def test_transactions_retried_when_opted_in(self):
+        rds_client = fake_client()
+        client, _ = build_client(rds_client, retry_in_transaction=True)
+        transaction = client.begin_transaction()
+        rds_client.failures.append(communications_failure())
+        self.assertEqual([{'id': 0}], transaction.query('select id from t'))
+        self.assertEqual(2, len(rds_client.statements))
+
+    def test_warm_up(self):
+        rds_client = fake_client([FakeClientError('DatabaseResumingException', 'resuming') for _ in range(3)])
+        client = DataAPIClient(rds_client, 'secret', 'cluster', 'db')
+        client.warm_up(retry_policy=RetryPolicy(max_attempts=None, sleep=lambda x: None))
+        self.assertEqual(4, rds_client.calls)
+
+    def test_keep_alive_ping(self):
+        rds_client = fake_client([communications_failure()])
+        keep_alive = DataAPIClient(rds_client, 'secret', 'cluster', 'db').keep_alive(interval=60)
+        self.assertFalse(keep_alive.ping())
+        self.assertIsNotNone(keep_alive.last_error)
+        self.assertTrue(keep_alive.ping())
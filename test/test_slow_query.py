@@ -0,0 +1,162 @@
+import threading
+import unittest
+
+from benchmarks import FakeRdsDataClient, ColumnSpec
+from data_api_mapper import DataAPIClient, SlowQueryLog, HistogramCollector
+
+
+class ExplainRdsDataClient(FakeRdsDataClient):
+
+    def __init__(self, explain_failures=()) -> None:
+        super().__init__(1, [ColumnSpec('id', 'int4')])
+        self.explain_failures = list(explain_failures)
+
+    def sql(self):
+        return [x['sql'] for x in self.statements]
+
+    def explains(self):
+        return [x for x in self.statements if x['sql'].startswith('EXPLAIN')]
+
+    def execute_statement(self, **kwargs):
+        if not kwargs['sql'].startswith('EXPLAIN'):
+            return super().execute_statement(**kwargs)
+        self._record(kwargs)
+        if self.explain_failures:
+            raise self.explain_failures.pop(0)
+        return {
+            'columnMetadata': [{'name': 'QUERY PLAN', 'tableName': '', 'typeName': 'json', 'nullable': 1}],
+            'records': [[{'stringValue': '[{"Plan": {"Node Type": "Seq Scan"}}]'}]]
+        }
+
+
+def build_client(rds_client=None):
+    return DataAPIClient(rds_client or ExplainRdsDataClient(), 'secret', 'cluster', 'db')
+
+
+class TestSlowQueryLog(unittest.TestCase):
+
+    def test_explain_once_per_fingerprint(self):
+        client = build_client()
+        slow_log = client.add_listener(SlowQueryLog(client, threshold=0.0))
+        for x in range(0, 3):
+            client.query('select id from t where id = :id', {'id': x})
+        client.query('select id from other')
+        slow_log.close()
+        self.assertEqual(['EXPLAIN (FORMAT JSON) select id from t where id = :id',
+                          'EXPLAIN (FORMAT JSON) select id from other'],
+                         [x['sql'] for x in client.rds_client.explains()])
+        report = slow_log.report(order_by='count')
+        self.assertEqual(2, len(report))
+        self.assertEqual('select id from t where id = ?', report[0]['fingerprint'])
+        self.assertEqual(3, report[0]['count'])
+        self.assertEqual('Seq Scan', report[0]['plan'][0]['Plan']['Node Type'])
+        self.assertIsNone(report[0]['plan_error'])
+
+    def test_fast_queries_are_not_explained(self):
+        client = build_client()
+        slow_log = client.add_listener(SlowQueryLog(client, threshold=60))
+        client.query('select id from t')
+        self.assertEqual(['select id from t'], client.rds_client.sql())
+        stats = slow_log.report()[0]
+        self.assertEqual(0, stats['slow_count'])
+        self.assertIsNone(stats['plan'])
+        self.assertIsNotNone(stats['p50'])
+
+    def test_rolling_window(self):
+        client = build_client()
+        slow_log = client.add_listener(SlowQueryLog(client, threshold=60, window=5))
+        for _ in range(0, 20):
+            client.query('select id from t')
+        self.assertEqual(20, slow_log.report()[0]['count'])
+        self.assertEqual(5, len(slow_log.stats['select id from t'].latencies))
+
+    def test_report_order(self):
+        client = build_client()
+        slow_log = client.add_listener(SlowQueryLog(client, threshold=60))
+        client.query('select id from t')
+        client.query('select id from other')
+        client.query('select id from other')
+        self.assertEqual('select id from other', slow_log.report(order_by='count')[0]['fingerprint'])
+        self.assertEqual(2, len(slow_log.report(order_by='p95')))
+        with self.assertRaises(ValueError):
+            slow_log.report(order_by='plan')
+
+    def test_explain_is_invisible_to_listeners(self):
+        client = build_client()
+        slow_log = client.add_listener(SlowQueryLog(client, threshold=0.0))
+        collector = client.add_listener(HistogramCollector(by_fingerprint=True))
+        client.query('select id from t')
+        slow_log.close()
+        self.assertEqual(['select id from t'], collector.keys())
+        self.assertEqual(['select id from t'], [x['fingerprint'] for x in slow_log.report()])
+
+    def test_explain_runs_in_background(self):
+        client = build_client()
+        slow_log = client.add_listener(SlowQueryLog(client, threshold=0.0))
+        client.query('select id from t')
+        slow_log.close()
+        explain = client.rds_client.explains()[0]
+        self.assertNotIn('transactionId', explain)
+        self.assertTrue(explain['thread'].startswith('data-api-explain'))
+
+    def test_transactions_are_not_explained_by_default(self):
+        client = build_client()
+        slow_log = client.add_listener(SlowQueryLog(client, threshold=0.0))
+        client.begin_transaction().query('select id from t')
+        slow_log.close()
+        self.assertEqual([], client.rds_client.explains())
+        self.assertIsNone(slow_log.report()[0]['plan'])
+
+    def test_explain_in_transaction_uses_a_savepoint(self):
+        client = build_client(ExplainRdsDataClient([ValueError('relation does not exist')]))
+        slow_log = client.add_listener(SlowQueryLog(client, threshold=0.0, explain_in_transaction=True))
+        transaction = client.begin_transaction()
+        transaction.query('select id from t')
+        self.assertEqual([
+            'select id from t', 'SAVEPOINT data_api_mapper_explain', 'EXPLAIN (FORMAT JSON) select id from t',
+            'ROLLBACK TO SAVEPOINT data_api_mapper_explain'
+        ], client.rds_client.sql())
+        self.assertTrue(all(x['transactionId'] == transaction.transaction_id for x in client.rds_client.statements))
+        self.assertEqual('relation does not exist', slow_log.report()[0]['plan_error'])
+        transaction.query('select id from t')
+        self.assertEqual('RELEASE SAVEPOINT data_api_mapper_explain', client.rds_client.sql()[-1])
+        self.assertIsNotNone(slow_log.report()[0]['plan'])
+        self.assertIsNone(slow_log.report()[0]['plan_error'])
+
+    def test_failed_statements_are_not_explained(self):
+        client = build_client()
+        slow_log = client.add_listener(SlowQueryLog(client, threshold=0.0))
+        client.rds_client.failures.append(ValueError('statement timeout'))
+        with self.assertRaises(ValueError):
+            client.query('select id from t')
+        slow_log.close()
+        self.assertEqual([], client.rds_client.explains())
+        self.assertEqual(1, slow_log.report()[0]['count'])
+
+    def test_explain_errors_are_retried(self):
+        client = build_client(ExplainRdsDataClient([ValueError('throttled') for _ in range(0, 5)]))
+        slow_log = client.add_listener(SlowQueryLog(client, threshold=0.0, background=False, max_explain_attempts=3))
+        client.query('select id from t')
+        self.assertEqual('throttled', slow_log.report()[0]['plan_error'])
+        for _ in range(0, 4):
+            client.query('select id from t')
+        self.assertEqual(3, len(client.rds_client.explains()))
+
+    def test_pending_explain_is_not_reported_as_error(self):
+        started, release = threading.Event(), threading.Event()
+
+        class BlockingRdsDataClient(ExplainRdsDataClient):
+            def execute_statement(self, **kwargs):
+                if kwargs['sql'].startswith('EXPLAIN'):
+                    started.set()
+                    release.wait(5)
+                return super().execute_statement(**kwargs)
+
+        client = build_client(BlockingRdsDataClient())
+        slow_log = client.add_listener(SlowQueryLog(client, threshold=0.0))
+        client.query('select id from t')
+        started.wait(5)
+        self.assertIsNone(slow_log.report()[0]['plan_error'])
+        release.set()
+        slow_log.close()
+        self.assertIsNotNone(slow_log.report()[0]['plan'])